@@ -1,4 +1,6 @@
-import urllib
+import asyncio
+import aiohttp
+import urllib3
 
 class AttenuatorException(Exception):
     """Exceptions for Attenuator Interactions"""
@@ -7,6 +9,10 @@ class AttenuatorException(Exception):
 
 class Attenuator(object):
     """ Automate an Attenuator through its web APIs """
+    __slots__ = ('model_name', 'serial_number', 'ip_address', 'port', 'subnet_mask',
+                 'network_gateway', 'mac_address', '_password', '_url', '_cmd_prefix',
+                 '_cmd_url', '_http', '_owns_http')
+
     START_MODE_LAST_ATTENUATION = 'L'
     START_MODE_FIXED_ATTENUATION = 'F'
     START_MODE_FACTORY_DEFAULT = 'N'
@@ -20,7 +26,73 @@ class Attenuator(object):
     MODE_ON = 'ON'
     MODE_OFF = 'OFF'
 
-    def __init__(self, device_details):
+    # (method name, parameter, parameter type, command, error message,
+    #  docstring summary, parameter description)
+    _SETTERS = (
+        ('set_startup_attenuation_mode', 'start_mode', str, 'STARTUPATT:INDICATOR:%s',
+         'Command to change attenuator startup mode failed',
+         'Set startup attenuation mode',
+         'the startup mode (use START_MODE_* constants)'),
+        ('hop_mode_set_points', 'points', int, ':HOP:POINTS:%s',
+         'Command to set number of hop points failed',
+         'Sets the number of points to be used in the attenuation hop sequence',
+         'the number of points to set'),
+        ('hop_mode_set_direction', 'direction', str, ':HOP:DIRECTION:%s',
+         'Command to set hop direction failed',
+         'Sets the direction in which the attenuator will progress through the list of '
+         'attenuation hops',
+         'the sequence direction (see DIRECTION_* constants)'),
+        ('hop_mode_set_indexed_point', 'point', int, ':HOP:POINT:%s',
+         'Command to set indexed point failed',
+         'Select a point in the hop sequence to be further configured',
+         'the point to select'),
+        ('hop_mode_set_point_dwell_time_units', 'units', str, ':HOP:DWELL_UNIT:%s',
+         'Command to set dwell time units failed',
+         'Sets the units to be used for the dwell time of the indexed point',
+         'the units to set (see DWELL_TIME_UNITS_* constants)'),
+        ('hop_mode_set_point_dwell_time', 'dwell_time', int, ':HOP:DWELL:%s',
+         'Command to set dwell time failed',
+         'Sets the dwell time of the indexed point in the hop sequence',
+         'the time to set'),
+        ('hop_mode_set_point_attenuation', 'db', float, ':HOP:ATT:%s',
+         'Command to set point attenuation failed',
+         'Sets the attenuation of the indexed hop point',
+         'the attenuation to set (in db)'),
+        ('set_hop_mode', 'mode', str, ':HOP:MODE:%s',
+         'Command to set hop mode failed',
+         'Enable or disable the hop sequence',
+         'on/off (see MODE_* constants)'),
+        ('sweep_mode_set_sweep_direction', 'direction', str, ':SWEEP:DIRECTION:%s',
+         'Command to set sweep direction failed',
+         'Sets the direction in which the attenuation level will sweep',
+         'the direction (see DIRECTION_* constants)'),
+        ('sweep_mode_set_dwell_time_units', 'units', str, ':SWEEP:DWELL_UNIT:%s',
+         'Command to set sweep dwell time units failed',
+         'Sets the units to be used for the sweep dwell time',
+         'the units to set (see DWELL_TIME_UNITS_* constants)'),
+        ('sweep_mode_set_dwell_time', 'dwell_time', int, ':SWEEP:DWELL:%s',
+         'Command to set sweep dwell time failed',
+         'Sets the dwell time to be used for the sweep',
+         'the dwell time to set'),
+        ('sweep_mode_set_start_attenuation', 'db', float, ':SWEEP:START:%s',
+         'Command to set sweep start attenuation failed',
+         'Sets the first attenuation level to be loaded during the sweep',
+         'the attenuation level to set (in db)'),
+        ('sweep_mode_set_stop_attenuation', 'db', float, ':SWEEP:STOP:%s',
+         'Command to set sweep stop attenuation failed',
+         'Sets the final attenuation level to be loaded during the sweep',
+         'the attenuation level to be set (in db)'),
+        ('sweep_mode_set_step_size', 'db', float, ':SWEEP:STEPSIZE:%s',
+         'Command to set sweep step size failed',
+         'Sets the attenuation step size',
+         'the attenuation step size for the sweep (in db)'),
+        ('set_sweep_mode', 'mode', str, ':SWEEP:MODE:%s',
+         'Command to set sweep mode failed',
+         'Enable or disable the sweep sequence',
+         'on/off (see MODE_* constants)'),
+    )
+
+    def __init__(self, device_details, http: urllib3.PoolManager=None):
         self.model_name = device_details['Model Name']
         self.serial_number = device_details['Serial Number']
         self.ip_address = device_details['IP Address']
@@ -30,6 +102,24 @@ class Attenuator(object):
         self.mac_address = device_details['Mac Address']
         self._url = "http://%s:%s/" % (self.ip_address, self.port)
         self.password = None
+        self._owns_http = http is None
+        self._http = self.http_pool_manager() if http is None else http
+
+    @property
+    def password(self) -> str:
+        """Password sent with every command (None if the attenuator is not password protected)"""
+        return self._password
+
+    @password.setter
+    def password(self, password: str):
+        self._password = password
+        self._cmd_prefix = password + ';' if password else ''
+        self._cmd_url = self._url + self._cmd_prefix
+
+    @property
+    def command_prefix(self) -> str:
+        """Prefix sent in front of every command (carries the password if one is set)"""
+        return self._cmd_prefix
 
     def __str__(self) -> str:
         return self._get_attenuator_details()
@@ -40,28 +130,163 @@ class Attenuator(object):
         :returns: details of the attenuator
         :rtype: string
         """
-        return "Model Name: " + self.model_name + "\n" + \
-            "Serial Number: " + self.serial_number + "\n" + \
-            "IP Address: " + self.ip_address + " Port: " + self.port + "\n" + \
-            "Subnet Mask: " + self.subnet_mask + "\n" + \
-            "Network Gateway: " + self.network_gateway + "\n" + \
-            "Mac Address: " + self.mac_address
-
-    def _send_http_cmd(self, command: str) -> str:
+        return (f"Model Name: {self.model_name}\n"
+                f"Serial Number: {self.serial_number}\n"
+                f"IP Address: {self.ip_address} Port: {self.port}\n"
+                f"Subnet Mask: {self.subnet_mask}\n"
+                f"Network Gateway: {self.network_gateway}\n"
+                f"Mac Address: {self.mac_address}")
+
+    def _send_http_cmd(self, command: str) -> bytes:
         """Send HTTP commands to the Attenuator
 
         :param command: the command to send
         :type command: string
         :returns: command result
-        :rtype: string
+        :rtype: bytes
         """
-        if self.password:
-            http_cmd = self._url + self.password + ';' + command
-        else:
-            http_cmd = self._url + command
-        request_response = urllib.request.urlopen(urllib.request.Request(http_cmd),
-                                           timeout=60)
-        return request_response.read()
+        response = self._http.urlopen('GET', self._cmd_url + command)
+        if not 200 <= response.status < 300:
+            raise AttenuatorException('Command %s failed with HTTP status %s' %
+                                      (command, response.status))
+        return response.data
+
+    def _expect(self, return_code: bytes, msg: str, ok: bytes=b'1'):
+        """Check the result of a command
+
+        :param return_code: the command result
+        :type return_code: bytes
+        :param msg: the exception message if the command failed
+        :type msg: string
+        :param ok: the result of a successful command
+        :type ok: bytes
+        """
+        if return_code.strip() != ok:
+            raise AttenuatorException(msg)
+
+    def _expect_attenuation(self, return_code: bytes):
+        """Check the result of a command setting an attenuation
+
+        :param return_code: the command result
+        :type return_code: bytes
+        """
+        return_code = return_code.strip()
+        if return_code == b'0':
+            raise AttenuatorException('Command to set Attenuation Failed')
+        if return_code == b'2':
+            raise AttenuatorException("Requested attenuation was higher than the allowed range, " +
+                                        "the attenuation was set to the device's maximum")
+
+    def close(self) -> None:
+        """Close the HTTP connections held open to the Attenuator
+
+        Connections of a pool manager shared with other attenuators are left to its owner.
+        """
+        if self._owns_http:
+            self._http.clear()
+
+    @staticmethod
+    def http_pool_manager(num_pools: int=1) -> urllib3.PoolManager:
+        """Create the pool manager keeping the HTTP connections to attenuators alive
+
+        :param num_pools: the number of attenuators to keep connections open to
+        :type num_pools: int
+        :returns: the pool manager
+        :rtype: urllib3.PoolManager
+        """
+        return urllib3.PoolManager(num_pools=num_pools, maxsize=2,
+                                   timeout=urllib3.Timeout(connect=5, read=60),
+                                   retries=urllib3.Retry(total=2, backoff_factor=0.1))
+
+    @staticmethod
+    def async_session() -> aiohttp.ClientSession:
+        """Create a session to be used with the coroutine variants of the commands
+
+        The number of connections is only limited per attenuator, so commands sent to many
+        attenuators at once are all in flight together.
+
+        :returns: a session keeping its connections alive between commands
+        :rtype: aiohttp.ClientSession
+        """
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=2, force_close=False),
+            timeout=aiohttp.ClientTimeout(sock_connect=5, sock_read=60))
+
+    async def _a_send(self, session: aiohttp.ClientSession, command: str) -> bytes:
+        """Coroutine variant of _send_http_cmd
+
+        :param session: the session to send the command through (see async_session)
+        :type session: aiohttp.ClientSession
+        :param command: the command to send
+        :type command: string
+        :returns: command result
+        :rtype: bytes
+        """
+        async with session.get(self._cmd_url + command) as response:
+            if not 200 <= response.status < 300:
+                raise AttenuatorException('Command %s failed with HTTP status %s' %
+                                          (command, response.status))
+            return await response.read()
+
+    async def program_hop_sequence(self, points: [(float, int)],
+                                   session: aiohttp.ClientSession=None):
+        """Configure the full hop sequence
+
+        The hop points are configured through the indexed point, which is state held by the
+        attenuator, so the commands for a single attenuator are issued in order. Gather this
+        coroutine across several attenuators to program them concurrently.
+
+        :param points: (attenuation in db, dwell time) for each point of the sequence
+        :type points: list
+        :param session: the session to use (a new one is created if not given)
+        :type session: aiohttp.ClientSession
+        """
+        if session is None:
+            async with self.async_session() as session:
+                return await self.program_hop_sequence(points, session)
+        batch = self.batch()
+        batch.hop_mode_set_points(len(points))
+        for i, (db, dwell_time) in enumerate(points):
+            batch.hop_mode_set_indexed_point(i)
+            batch.hop_mode_set_point_attenuation(db)
+            batch.hop_mode_set_point_dwell_time(dwell_time)
+        await batch.a_run(session)
+
+    @staticmethod
+    async def program_hop_sequences(sequences: {'Attenuator': [(float, int)]}):
+        """Configure the hop sequence of several attenuators concurrently
+
+        :param sequences: the hop points (see program_hop_sequence) for each attenuator
+        :type sequences: dict
+        """
+        async with Attenuator.async_session() as session:
+            await asyncio.gather(*[attenuator.program_hop_sequence(points, session)
+                                   for attenuator, points in sequences.items()])
+
+    def batch(self) -> 'AttenuatorBatch':
+        """Queue commands to be sent together
+
+        Used as a context manager the queued commands are sent when the block exits, otherwise
+        they are sent by AttenuatorBatch.run, AttenuatorBatch.a_run or run_batches.
+        Batches accept the setters of _SETTERS plus set_attenuation and
+        set_startup_attenuation_value. The commands of one batch are sent one after another,
+        exactly as calling the setters directly would: batching is only faster when
+        run_batches sends the batches of several attenuators concurrently.
+
+        :returns: a batch accepting the same setters as the attenuator
+        :rtype: AttenuatorBatch
+        """
+        return AttenuatorBatch(self)
+
+    @staticmethod
+    async def run_batches(batches: ['AttenuatorBatch']):
+        """Send several batches concurrently, each batch keeping its commands in order
+
+        :param batches: the batches to send (typically one per attenuator)
+        :type batches: list
+        """
+        async with Attenuator.async_session() as session:
+            await asyncio.gather(*[batch.a_run(session) for batch in batches])
 
     def set_attenuation(self, db: float) -> None:
         """Sets the attenuation
@@ -69,36 +294,21 @@ class Attenuator(object):
         :param db: the attenation to set (in db)
         :type db: float
         """
-        return_code = self._send_http_cmd(":SETATT=%s" % db)
-        if return_code == '0':
-            raise AttenuatorException('Command to set Attenuation Failed')
-        if return_code == '2':
-            raise AttenuatorException("Requested attenuation was higher than the allowed range, " +
-                                        "the attenuation was set to the device's maximum")
+        self._expect_attenuation(self._send_http_cmd(":SETATT=%s" % db))
 
-    def get_attenuation(self) -> str:
+    def get_attenuation(self) -> bytes:
         """Returns the current attenuation
 
         :returns: the current attenuation
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(":ATT?")
 
-    def set_startup_attenuation_mode(self, start_mode: str):
-        """Set startup attenuation mode
-
-        :param start_mode: the startup mode (use START_MODE_* constants)
-        :type start_mode: string
-        """
-        return_code = self._send_http_cmd('STARTUPATT:INDICATOR:%s' % start_mode)
-        if return_code != '1':
-            raise AttenuatorException('Command to change attenuator startup mode failed')
-
-    def get_startup_attenuation_mode(self) -> str:
+    def get_startup_attenuation_mode(self) -> bytes:
         """Returns the startup mode currently in use by the attenuator
 
         :returns: the current start mode (see START_MODE_* constants)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(":STARTUPATT:INDICATOR?")
 
@@ -109,247 +319,193 @@ class Attenuator(object):
         :param db: the initial attenuation (in db)
         :type db: float
         """
-        return_code = self._send_http_cmd(":STARTUPATT:VALUE:%s" % db)
-        if return_code == '0':
-            raise AttenuatorException('Command to set Attenuation Failed')
-        if return_code == '2':
-            raise AttenuatorException("Requested attenuation was higher than the allowed range," +
-                                        "the attenuation was set to the device's maximum")
+        self._expect_attenuation(self._send_http_cmd(":STARTUPATT:VALUE:%s" % db))
 
-    def get_startup_attenuation_value(self) -> str:
+    def get_startup_attenuation_value(self) -> bytes:
         """Gets the attenuation value to be loaded when the attenuator is first powered
            up in Fixed Attenuation mode
 
         :returns: the attenuation value (in db)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(":STARTUPATT:VALUE?")
 
-    def get_firmware_version(self) -> str:
+    def get_firmware_version(self) -> bytes:
         """Gets the firmware version of the attenuator
 
         :returns: the firmware version
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':FIRMWARE?')
 
-    def hop_mode_set_points(self, points: int):
-        """Sets the number of points to be used in the attenuation hop sequence
-
-        :param points: the number of points to set
-        :type points: int
-        """
-        return_code = self._send_http_cmd(':HOP:POINTS:%s' % points)
-        if return_code != '1':
-            raise AttenuatorException('Command to set number of hop points failed')
-
-    def hop_mode_get_points(self) -> str:
+    def hop_mode_get_points(self) -> bytes:
         """Returns the number of points to be used in the attenuation hop sequence
 
         :returns: the number of points
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':HOP:POINTS?')
 
-    def hop_mode_set_direction(self, direction: str):
-        """Sets the direction in which the attenuator will progress through the list of attenuation hops
-
-        :param direction: the sequence direction (see DIRECTION_* constants)
-        :type direction: string
-        """
-        return_code = self._send_http_cmd(':HOP:DIRECTION:%s' % direction)
-        if return_code != '1':
-            raise AttenuatorException('Command to set hop direction failed')
-
-    def hop_mode_get_direction(self) -> str:
+    def hop_mode_get_direction(self) -> bytes:
         """Returns the direction in which the attenuator will progress through the lsit of attenuation
 
         :returns: the hop direction (see DIRECTION_* constants)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':HOP:DIRECTION?')
 
-    def hop_mode_set_indexed_point(self, point:int):
-        """Select a point in the hop sequence to be further configured
-
-        :param point: the point to select
-        :type point: int
-        """
-        return_code = self._send_http_cmd(':HOP:POINT:%s' % point)
-        if return_code != '1':
-            raise AttenuatorException('Command to set indexed point failed')
-
-    def hop_mode_get_indexed_point(self) -> str:
+    def hop_mode_get_indexed_point(self) -> bytes:
         """Returns the currently indexed attenuation point within the hop sequence
 
         :returns: the currently indexed point
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':HOP:POINT?')
 
-    def hop_mode_set_point_dwell_time_units(self, units: str):
-        """Sets the units to be used for the dwell time of the indexed point
-
-        :param units: the units to set (see DWELL_TIME_UNITS_* constants)
-        :type units: string
-        """
-        return_code = self._send_http_cmd(':HOP:DWELL_UNIT:%s' % units)
-        if return_code != '1':
-            raise AttenuatorException('Command to set dwell time units failed')
-
-    def hop_mode_set_point_dwell_time(self, dwell_time: int):
-        """Sets the dwell time of the indexed point in the hop sequence
-
-        :param dwell_time: the time to set
-        :type dwell_time: int
-        """
-        return_code = self._send_http_cmd(':HOP:DWELL:%s' % dwell_time)
-        if return_code != '1':
-            raise AttenuatorException('Command to set dwell time failed')
-
-    def hop_mode_get_point_dwell_time(self) -> str:
+    def hop_mode_get_point_dwell_time(self) -> bytes:
         """Gets the dwell time (including units) of the indexed point in the hop sequence
 
         :returns: the dwell time (including units)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':HOP:DWELL?')
 
-    def hop_mode_set_point_attenuation(self, db: float):
-        """Sets the attenuation of the indexed hop point
-
-        :param db: the attenuation to set (in db)
-        :type db: float
-        """
-        return_code = self._send_http_cmd(':HOP:ATT:%s' % db)
-        if return_code != '1':
-            raise AttenuatorException('Command to set point attenuation failed')
-
-    def hop_mode_get_point_attenuation(self) -> str:
+    def hop_mode_get_point_attenuation(self) -> bytes:
         """Returns the attenuation of the indexed hop point
 
         :returns: the attenaution (in db)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':HOP:ATT?')
 
-    def set_hop_mode(self, mode: str):
-        """Enable or disable the hop sequence
-
-        :param mode: on/off (see MODE_* constants)
-        :type mode: string
-        """
-        return_code = self._send_http_cmd(':HOP:MODE:%s' % mode)
-        if return_code != '1':
-            raise AttenuatorException('Command to set hop mode failed')
-
-    def sweep_mode_set_sweep_direction(self, direction: str):
-        """Sets the direction in which the attenuation level will sweep
-
-        :param direction: the direction (see DIRECTION_* constants)
-        :type direction: string
-        """
-        return_code = self._send_http_cmd(':SWEEP:DIRECTION:%s' % direction)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep direction failed')
-
-    def sweep_mode_get_sweep_direction(self) -> str:
+    def sweep_mode_get_sweep_direction(self) -> bytes:
         """Returns the direction in which the attenuation level will sweep
 
         :returns: the direction of the attenuation sweep (see DIRECTION_* constants)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':SWEEP:DIRECTION?')
 
-    def sweep_mode_set_dwell_time_units(self, units: str):
-        """Sets the units to be used for the sweep dwell time
-
-        :param units: the units to set (see DWELL_TIME_UNITS_* constants)
-        :type units: string
-        """
-        return_code = self._send_http_cmd(':SWEEP:DWELL_UNIT:%s' % units)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep dwell time units failed')
-
-    def sweep_mode_set_dwell_time(self, dwell_time: str):
-        """Sets the dwell time to be used for the sweep
-
-        :param dwell_time: the dwell time to set
-        :type dwell_time: int
-        """
-        return_code = self._send_http_cmd(':SWEEP:DWELL:%s' % dwell_time)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep dwell time failed')
-
-    def sweep_mode_get_dwell_time(self) -> str:
+    def sweep_mode_get_dwell_time(self) -> bytes:
         """Returns the dwell time (including units) of the attenuation sweep
 
         :returns: the dwell time (including units)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':SWEEP:DWELL?')
 
-    def sweep_mode_set_start_attenuation(self, db: float):
-        """Sets the first attenuation level to be loaded during the sweep
-
-        :param db: the attenuation level to set (in db)
-        :type db: float
-        """
-        return_code = self._send_http_cmd(':SWEEP:START:%s' % db)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep start attenuation failed')
-
-    def sweep_mode_get_start_attenuation(self) -> str:
+    def sweep_mode_get_start_attenuation(self) -> bytes:
         """Returns the first attenuation level to be loaded during the sweep
 
         :returns: the start attenuation level (in db)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':SWEEP:START?')
 
-    def sweep_mode_set_stop_attenuation(self, db: float):
-        """Sets the final attenuation level to be loaded during the sweep
-
-        :param db: the attenuation level to be set (in db)
-        :type db: float
-        """
-        return_code = self._send_http_cmd(':SWEEP:STOP:%s' % db)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep stop attenuation failed')
-
-    def sweep_mode_get_stop_attenuation(self) -> str:
+    def sweep_mode_get_stop_attenuation(self) -> bytes:
         """Returns the final attenuation level to be loaded during the sweep
 
         :returns: the final attenuation level (in db)
-        :type: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':SWEEP:STOP?')
 
-    def sweep_mode_set_step_size(self, db: float):
-        """Sets the attenuation step size
-
-        :param db: the attenuation step size for the sweep (in db)
-        :type db: float
-        """
-        return_code = self._send_http_cmd(':SWEEP:STEPSIZE:%s' % db)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep step size failed')
-
-    def sweep_mode_get_step_size(self) -> str:
+    def sweep_mode_get_step_size(self) -> bytes:
         """Returns the attenuation step size
 
         :returns: the step size to be used for the sweep (in db)
-        :rtype: string
+        :rtype: bytes
         """
         return self._send_http_cmd(':SWEEP:STEPSIZE?')
 
-    def set_sweep_mode(self, mode: str):
-        """Enable or disable the sweep sequence
 
-        :param mode: on/off (see MODE_* constants)
-        :type mode: string
-        """
-        return_code = self._send_http_cmd(':SWEEP:MODE:%s' % mode)
-        if return_code != '1':
-            raise AttenuatorException('Command to set sweep mode failed')
-    
+class AttenuatorBatch(object):
+    """ Commands queued for an Attenuator (see Attenuator.batch)
+
+    The attenuator applies most commands to its current state (e.g. the indexed hop point), so
+    the commands of a batch are always sent in the order they were queued, over one keep-alive
+    connection. Concurrency comes from running the batches of several attenuators together.
+    """
+    _COMMANDS = {setter[0]: (setter[3], setter[4]) for setter in Attenuator._SETTERS}
+    # setters reporting an out of range attenuation (see Attenuator._expect_attenuation)
+    _ATTENUATION_COMMANDS = {'set_attenuation': ':SETATT=%s',
+                             'set_startup_attenuation_value': ':STARTUPATT:VALUE:%s'}
+
+    def __init__(self, attenuator: Attenuator):
+        self.attenuator = attenuator
+        self.commands = []
+
+    def __getattr__(self, name: str):
+        if name in self._ATTENUATION_COMMANDS:
+            command = self._ATTENUATION_COMMANDS[name]
+            check = self.attenuator._expect_attenuation
+        elif name in self._COMMANDS:
+            command, error = self._COMMANDS[name]
+            check = lambda return_code: self.attenuator._expect(return_code, error)
+        else:
+            raise AttributeError("'%s' cannot be batched" % name)
+
+        def queue(value):
+            self.commands.append((command % value, check))
+        return queue
+
+    def __enter__(self) -> 'AttenuatorBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
+
+    def run(self):
+        """Send the queued commands, stopping at the first one that fails"""
+        commands, self.commands = self.commands, []
+        for command, check in commands:
+            check(self.attenuator._send_http_cmd(command))
+
+    async def a_run(self, session: aiohttp.ClientSession):
+        """Coroutine variant of run
+
+        :param session: the session to send the commands through (see Attenuator.async_session)
+        :type session: aiohttp.ClientSession
+        """
+        commands, self.commands = self.commands, []
+        for command, check in commands:
+            check(await self.attenuator._a_send(session, command))
+
+
+def _make_setter(name: str, param: str, param_type: type, command: str, error: str,
+                 summary: str, param_doc: str):
+    """Build an Attenuator method sending a command and checking its result
+
+    :param name: the method name
+    :type name: string
+    :param param: the method parameter name
+    :type param: string
+    :param param_type: the method parameter type
+    :type param_type: type
+    :param command: the command template (formatted with the parameter)
+    :type command: string
+    :param error: the exception message if the command fails
+    :type error: string
+    :param summary: the first line of the method docstring
+    :type summary: string
+    :param param_doc: the description of the parameter
+    :type param_doc: string
+    :returns: the method
+    :rtype: function
+    """
+    namespace = {}
+    exec("def %s(self, %s: param_type):\n"
+         "    self._expect(self._send_http_cmd(command %% %s), error)\n" % (name, param, param),
+         {'param_type': param_type, 'command': command, 'error': error}, namespace)
+    setter = namespace[name]
+    setter.__qualname__ = 'Attenuator.' + name
+    setter.__module__ = __name__
+    setter.__doc__ = "%s\n\n:param %s: %s\n:type %s: %s\n" % (
+        summary, param, param_doc, param, {str: 'string'}.get(param_type, param_type.__name__))
+    return setter
+
+
+for _setter in Attenuator._SETTERS:
+    setattr(Attenuator, _setter[0], _make_setter(*_setter))
+del _setter
@@ -0,0 +1,90 @@
+import asyncio
+from array import array
+from Attenuator import Attenuator, AttenuatorException
+
+class DeviceFleet(object):
+    """ Send the same command to many Attenuators at once
+
+    The fleet keeps the device addresses and ports in their own columns, which fleet-wide
+    commands walk to build their URLs, and holds one session open to every device between
+    them; call close() once done with the fleet.
+    """
+    __slots__ = ('ips', 'ports', 'attenuators', '_loop', '_session')
+
+    def __init__(self, attenuators: [Attenuator]):
+        self.attenuators = list(attenuators)
+        self.ips = [attenuator.ip_address for attenuator in self.attenuators]
+        self.ports = array('H', [int(attenuator.port) for attenuator in self.attenuators])
+        self._loop = None
+        self._session = None
+
+    def __len__(self) -> int:
+        return len(self.ips)
+
+    def _run(self, coroutine):
+        """Run a coroutine on the event loop owning the fleet session
+
+        :param coroutine: the coroutine to run
+        :returns: the coroutine result
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coroutine)
+
+    async def _a_send_all(self, command: str) -> list:
+        """Send a command to every device of the fleet concurrently
+
+        :param command: the command to send
+        :type command: string
+        :returns: the command result (or the exception raised) for each device
+        :rtype: list
+        """
+        async def send(url):
+            async with self._session.get(url) as response:
+                if not 200 <= response.status < 300:
+                    raise AttenuatorException('Command %s failed with HTTP status %s' %
+                                              (command, response.status))
+                return await response.read()
+
+        if self._session is None:
+            self._session = Attenuator.async_session()
+        urls = ["http://%s:%s/%s%s" % (ip, port, attenuator.command_prefix, command)
+                for ip, port, attenuator in zip(self.ips, self.ports, self.attenuators)]
+        return await asyncio.gather(*[send(url) for url in urls], return_exceptions=True)
+
+    def set_attenuation_all(self, db: float) -> None:
+        """Sets the attenuation of every device of the fleet
+
+        :param db: the attenation to set (in db)
+        :type db: float
+        """
+        return_codes = self._run(self._a_send_all(":SETATT=%s" % db))
+        errored, failed, clamped = [], [], []
+        for ip, return_code in zip(self.ips, return_codes):
+            if isinstance(return_code, BaseException):
+                errored.append('%s (%r)' % (ip, return_code))
+            elif return_code.strip() == b'0':
+                failed.append(ip)
+            elif return_code.strip() == b'2':
+                clamped.append(ip)
+        errors = []
+        if errored:
+            errors.append('Command to set Attenuation raised an error on: %s' %
+                          ', '.join(errored))
+        if failed:
+            errors.append('Command to set Attenuation Failed on: %s' % ', '.join(failed))
+        if clamped:
+            errors.append("Requested attenuation was higher than the allowed range, the "
+                          "attenuation was set to the device's maximum on: %s" %
+                          ', '.join(clamped))
+        if errors:
+            raise AttenuatorException('\n'.join(errors))
+
+    def close(self) -> None:
+        """Close the connections held open to the devices of the fleet"""
+        if self._session is not None:
+            self._run(self._session.close())
+            self._session = None
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
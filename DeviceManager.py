@@ -1,53 +1,170 @@
 import re
 import time
+import asyncio
 import socket
 import select
 from Attenuator import Attenuator
+try:
+    import netifaces
+except ImportError:
+    netifaces = None
+
+_DEVICE_FIELDS = ('Model Name', 'Serial Number', 'IP Address', 'Port', 'Subnet Mask',
+                  'Network Gateway', 'Mac Address')
+_FIELDS_RE = re.compile(rb"(?P<key>" + "|".join(_DEVICE_FIELDS).encode() + rb")[ \t]*[:=][ \t]*"
+                        rb"(?P<val>[^\r\n]*?)(?=\s{2,}|\r|\n|$)")
+
+def _parse_device_details(device: bytes) -> dict:
+    """Extract the fields of a response to the discovery broadcast
+
+    :param device: the device description response
+    :type device: bytes
+    :returns: the device details (empty if the response cannot be decoded)
+    :rtype: dict
+    """
+    try:
+        return {m['key'].decode(): m['val'].strip().decode()
+                for m in _FIELDS_RE.finditer(device)}
+    except UnicodeDecodeError:
+        return {}
+
+
+def _broadcast_addresses() -> [str]:
+    """Broadcast addresses of all the IPv4 interfaces of the host
+
+    :returns: the broadcast addresses (only '<broadcast>' if netifaces is not installed)
+    :rtype: list
+    """
+    if netifaces is None:
+        return ['<broadcast>']
+    broadcasts = [address['broadcast'] for interface in netifaces.interfaces()
+                  for address in netifaces.ifaddresses(interface).get(netifaces.AF_INET, [])
+                  if 'broadcast' in address]
+    return list(dict.fromkeys(broadcasts)) or ['<broadcast>']
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """ Queue the responses to the discovery broadcast as they are received """
+
+    def __init__(self, responses: asyncio.Queue):
+        self.responses = responses
+        self.seen = set()
+
+    def datagram_received(self, data: bytes, addr):
+        if addr not in self.seen:
+            self.seen.add(addr)
+            self.responses.put_nowait(data)
+
 
 class DeviceManager(object):
     """ Detect and Manage Mini-Circuits Devices on the LAN """
     MINI_CIRCUITS_LISTENTING_PORT = 4950
     MINI_CIRCUITS_ANSWERING_PORT = 4951
     SOCKET_BUFFER_SIZE = 1024
+    HTTP_POOLS = 64
 
-    def discover_devices(self, discovery_time: int=30) -> [Attenuator]:
+    def __init__(self):
+        self.http = Attenuator.http_pool_manager(self.HTTP_POOLS)
+
+    def close(self) -> None:
+        """Close the HTTP connections held open to the discovered devices"""
+        self.http.clear()
+
+    def discover_devices(self, discovery_time: int=30, expected_count: int=None) -> [Attenuator]:
         """Discover Mini-Circuits Devices on the LAN
 
         :param discovery_time: time to wait (seconds) for devices to respond to broadcast
         :type discovery_time: int
+        :param expected_count: stop waiting once this many valid devices have responded
+        :type expected_count: int
+        :returns: all detected devices
+        :rtype: list
+        """
+        discovered_devices = []
+        seen = set()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as discovery_socket:
+            discovery_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            discovery_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            discovery_socket.bind(('', self.MINI_CIRCUITS_ANSWERING_PORT))
+            for broadcast in _broadcast_addresses():
+                discovery_socket.sendto(b'MCLDAT?\n',
+                                        (broadcast, self.MINI_CIRCUITS_LISTENTING_PORT))
+            discovery_socket.setblocking(False)
+            timeout = time.time() + discovery_time
+            while time.time() < timeout:
+                if expected_count is not None and len(discovered_devices) >= expected_count:
+                    break
+                ready = select.select([discovery_socket], [], [], timeout-time.time())
+                if ready[0]:
+                    # drain every response already queued before selecting again
+                    while True:
+                        try:
+                            data, addr = discovery_socket.recvfrom(self.SOCKET_BUFFER_SIZE)
+                        except BlockingIOError:
+                            break
+                        if addr in seen:
+                            continue
+                        seen.add(addr)
+                        attenuator = self._parse_device(data)
+                        if attenuator:
+                            discovered_devices.append(attenuator)
+        return discovered_devices
+
+    async def discover_devices_async(self, discovery_time: int=30,
+                                     expected_count: int=None) -> [Attenuator]:
+        """Discover Mini-Circuits Devices on the LAN, parsing each response as it arrives
+
+        :param discovery_time: time to wait (seconds) for devices to respond to broadcast
+        :type discovery_time: int
+        :param expected_count: stop waiting once this many valid devices have responded
+        :type expected_count: int
         :returns: all detected devices
         :rtype: list
         """
-        broadcast_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        broadcast_socket.bind(('', 0))
-        broadcast_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        msg = 'MCLDAT?' + '\n'
-        broadcast_socket.sendto(msg, ('<broadcast>', self.MINI_CIRCUITS_LISTENTING_PORT))
-        receiver_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        receiver_socket.bind(('', self.MINI_CIRCUITS_ANSWERING_PORT))
-        broadcast_responses = []
-        timeout = time.time() + discovery_time
-        while time.time() < timeout:
-            ready = select.select([receiver_socket], [], [], timeout-time.time())
-            if ready[0]:
-                data, addr = receiver_socket.recvfrom(self.SOCKET_BUFFER_SIZE)
-                broadcast_responses.append(data)
+        loop = asyncio.get_running_loop()
+        responses = asyncio.Queue()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DiscoveryProtocol(responses),
+            local_addr=('0.0.0.0', self.MINI_CIRCUITS_ANSWERING_PORT), allow_broadcast=True)
         discovered_devices = []
-        for device in broadcast_responses:
-            try:
-                device_details = {}
-                for field in device.splitlines():
-                    if 'IP Address' in field:
-                        ip_address_pattern = "IP Address=([\d\.]*)  Port: (\d+)"
-                        match_ip_address = re.match(ip_address_pattern, field)
-                        if match_ip_address:
-                            device_details['IP Address'] = match_ip_address.group(1)
-                            device_details['Port'] = match_ip_address.group(2)
-                    else:
-                        split_fields = re.split('[:=]|\s\s+', field)
-                        for i in range(0, len(split_fields), 2):
-                            device_details[split_fields[i].strip()] = split_fields[i+1].strip()
-                discovered_devices.append(Attenuator(device_details))
-            except:
-                print("Invalid Device Description Response")
+        try:
+            for broadcast in _broadcast_addresses():
+                transport.sendto(b'MCLDAT?\n', (broadcast, self.MINI_CIRCUITS_LISTENTING_PORT))
+            timeout = loop.time() + discovery_time
+            while expected_count is None or len(discovered_devices) < expected_count:
+                remaining = timeout - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    device = await asyncio.wait_for(responses.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                attenuator = self._parse_device(device)
+                if attenuator:
+                    discovered_devices.append(attenuator)
+        finally:
+            transport.close()
         return discovered_devices
+
+    def _parse_device(self, device: bytes) -> Attenuator:
+        """Build an Attenuator from a response to the discovery broadcast
+
+        :param device: the device description response
+        :type device: bytes
+        :returns: the described device (None if the response is invalid)
+        :rtype: Attenuator
+        """
+        return self._create_attenuator(_parse_device_details(device))
+
+    def _create_attenuator(self, device_details: dict) -> Attenuator:
+        """Build an Attenuator from the fields of its description response
+
+        :param device_details: the device details (see _parse_device_details)
+        :type device_details: dict
+        :returns: the described device (None if the details are invalid)
+        :rtype: Attenuator
+        """
+        if any(field not in device_details for field in _DEVICE_FIELDS):
+            print("Invalid Device Description Response")
+            return None
+        return Attenuator(device_details, http=self.http)